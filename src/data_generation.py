@@ -1,12 +1,27 @@
 import numpy as np
 import pandas as pd
+from joblib import Parallel, delayed
+from numba import njit, prange
+
+
+# Rush-hour periods with higher congestion and demand
+_RUSH_HOURS = [7, 8, 9, 16, 17, 18]
+
+# Delivery time multiplier by hour of day for rush-hour congestion
+_RUSH_HOUR_MULTIPLIER = np.ones(24)
+_RUSH_HOUR_MULTIPLIER[_RUSH_HOURS] = 1.4
+
+# Generator for delivery time simulations that are not given one; created
+# once at import from OS entropy, so np.random.seed has no effect on it
+_DEFAULT_RNG = np.random.default_rng()
 
 
 def generate_synthetic_orders(
     start_date="2024-01-01",
     end_date="2024-03-01",
     zones=5,
-    seed=42
+    seed=42,
+    n_jobs=1
 ):
     """
     Generate a synthetic last-mile delivery order dataset.
@@ -25,6 +40,12 @@ def generate_synthetic_orders(
         Number of delivery zones
     seed : int
         Random seed for reproducibility
+    n_jobs : int
+        Number of worker threads, each simulating one contiguous chunk of
+        the simulation window. Must be a positive integer, since the
+        chunking (and therefore the output) is derived from it: each chunk
+        draws from its own child seed, so results are reproducible for a
+        given seed and n_jobs, but differ between n_jobs settings.
 
     Returns
     -------
@@ -33,9 +54,6 @@ def generate_synthetic_orders(
         and SLA indicators
     """
 
-    # Ensure reproducibility for experimentation and modeling
-    np.random.seed(seed)
-
     # Generate an hourly time index for the simulation window
     date_range = pd.date_range(
         start=start_date,
@@ -43,44 +61,107 @@ def generate_synthetic_orders(
         freq="h"
     )
 
-    orders = []
+    if n_jobs < 1:
+        raise ValueError("n_jobs must be a positive integer")
 
-    # Iterate over each hour in the simulation period
-    for ts in date_range:
-        hour = ts.hour
+    # Chunks follow the requested n_jobs rather than the machine's CPU
+    # count, so the output does not depend on where it is generated
+    n_chunks = min(n_jobs, len(date_range))
 
-        # Flag rush-hour periods with higher congestion and demand
-        is_rush = hour in [7, 8, 9, 16, 17, 18]
+    if n_chunks <= 1:
+        # Dedicated generator (PCG64) for reproducible experimentation
+        orders_df = _generate_orders(
+            date_range, zones, np.random.default_rng(seed)
+        )
+    else:
+        # Hours are independent, so contiguous chunks of the window are
+        # simulated in parallel from independent child seed streams;
+        # threads avoid copying results back since the bulk random draws
+        # and the delivery time kernel release the GIL. Numba's parallel
+        # kernels must not be entered from several threads at once, so
+        # each chunk uses the serial kernel
+        chunks = np.array_split(np.arange(len(date_range)), n_chunks)
+        seeds = np.random.SeedSequence(seed).spawn(n_chunks)
+        frames = Parallel(n_jobs=n_chunks, prefer="threads")(
+            delayed(_generate_orders)(
+                date_range[chunk],
+                zones,
+                np.random.default_rng(chunk_seed),
+                parallel=False
+            )
+            for chunk, chunk_seed in zip(chunks, seeds)
+        )
+        orders_df = pd.concat(frames, ignore_index=True)
 
-        # Simulate demand independently for each delivery zone
-        for zone_id in range(zones):
+    # SLA flag: on-time delivery defined as <= 45 minutes
+    orders_df["on_time"] = (orders_df["delivery_time_min"] <= 45).astype(int)
 
-            # Baseline Poisson demand for normal hours
-            base_demand = np.random.poisson(3)
+    return orders_df
 
-            # Add incremental demand during rush hours
-            if is_rush:
-                base_demand += np.random.poisson(4)
 
-            # Generate individual orders for the hour/zone
-            for _ in range(base_demand):
-                orders.append({
-                    "timestamp": ts,
-                    "zone_id": zone_id,
-                    "order_id": f"O{np.random.randint(1e9)}",
-                    "delivery_time_min": simulate_delivery_time(hour)
-                })
+def _generate_orders(date_range, zones, rng, parallel=True):
+    """
+    Simulate orders for every hour in `date_range` across all zones.
 
-    # Convert to DataFrame for downstream modeling
-    orders_df = pd.DataFrame(orders)
+    Parameters
+    ----------
+    date_range : pd.DatetimeIndex
+        Hourly timestamps to simulate
+    zones : int
+        Number of delivery zones
+    rng : np.random.Generator
+        Random generator to draw from
+    parallel : bool
+        Whether to use the multithreaded delivery time kernel
 
-    # SLA flag: on-time delivery defined as <= 45 minutes
-    orders_df["on_time"] = (orders_df["delivery_time_min"] <= 45).astype(int)
+    Returns
+    -------
+    orders_df : pd.DataFrame
+        Order-level dataset with timestamps, zones and delivery times
+    """
+
+    hours = date_range.hour.to_numpy()
+
+    # Flag rush-hour periods with higher congestion and demand
+    is_rush = np.isin(hours, _RUSH_HOURS)
+
+    # Poisson demand rate for every hour/zone cell: baseline of 3 orders,
+    # plus 4 incremental orders during rush hours
+    lam = np.full((len(date_range), zones), 3.0)
+    lam[is_rush] += 4.0
+
+    # Draw demand for all hour/zone cells in a single call
+    counts = rng.poisson(lam)
+
+    # Expand cell-level counts into individual orders
+    ts_idx = np.repeat(np.arange(len(date_range)), counts.sum(axis=1))
+    zone_idx = np.repeat(
+        np.tile(np.arange(zones), len(date_range)),
+        counts.ravel()
+    )
+    n_orders = ts_idx.size
+
+    # Integer order identifiers, stored as int64 rather than formatted
+    # strings to keep the order-level table compact
+    order_ids = rng.integers(0, 10**9, size=n_orders, dtype=np.int64)
+
+    # Traffic-adjusted delivery service time for every order
+    delivery_times = simulate_delivery_times(
+        hours[ts_idx], rng, parallel=parallel
+    )
+
+    # Convert to DataFrame for downstream modeling
+    orders_df = pd.DataFrame({
+        "timestamp": date_range[ts_idx],
+        "zone_id": zone_idx,
+        "order_id": order_ids,
+        "delivery_time_min": delivery_times
+    })
 
     return orders_df
 
 
-def simulate_delivery_time(hour):
+def simulate_delivery_time(hour, rng=None):
     """
     Simulate delivery service time in minutes.
 
@@ -91,6 +172,10 @@ def simulate_delivery_time(hour):
     ----------
     hour : int
         Hour of day (0–23)
+    rng : np.random.Generator, optional
+        Random generator to draw from; defaults to a module-level
+        generator that is not affected by np.random.seed, so pass one
+        for reproducible draws
 
     Returns
     -------
@@ -98,12 +183,81 @@ def simulate_delivery_time(hour):
         Simulated delivery time in minutes
     """
 
-    # Base delivery time with random noise
-    base = np.random.normal(25, 5)
+    if not (0 <= hour < 24 and hour == int(hour)):
+        raise ValueError("hour must be an integer between 0 and 23")
+
+    if rng is None:
+        rng = _DEFAULT_RNG
+
+    # Drawn in Python: passing a Generator into a jitted function unboxes
+    # it on every call, which costs far more than the draw itself
+    base = 25.0 + 5.0 * rng.standard_normal()
+
+    return max(10.0, base * _RUSH_HOUR_MULTIPLIER[int(hour)])
+
+
+def simulate_delivery_times(hours, rng=None, parallel=True):
+    """
+    Simulate delivery service times in minutes for many orders at once.
+
+    Vectorized counterpart of `simulate_delivery_time`, used when
+    generating order-level datasets.
+
+    Parameters
+    ----------
+    hours : array-like of int
+        Hour of day (0–23) for each order
+    rng : np.random.Generator, optional
+        Random generator to draw from; defaults to a module-level
+        generator that is not affected by np.random.seed, so pass one
+        for reproducible draws
+    parallel : bool
+        Whether to use the multithreaded kernel; set to False when
+        calling from several threads at once
+
+    Returns
+    -------
+    np.ndarray
+        Simulated delivery times in minutes
+    """
+
+    hours = np.asarray(hours)
+
+    if not ((hours >= 0) & (hours < 24) & (hours == np.floor(hours))).all():
+        raise ValueError("hours must be integers between 0 and 23")
+
+    if rng is None:
+        rng = _DEFAULT_RNG
+
+    hours = hours.astype(np.int64, copy=False)
+
+    # Base delivery times with random noise
+    base = rng.normal(25, 5, size=hours.size)
+
+    if parallel:
+        return _adjust_delivery_times(hours, base)
+
+    return _adjust_delivery_times_serial(hours, base)
+
+
+@njit(cache=True)
+def _adjust_delivery_time(hour, base):
+    # Inflate service times during rush-hour congestion via the hourly
+    # multiplier table and enforce a minimum feasible delivery time
+    return max(10.0, base * _RUSH_HOUR_MULTIPLIER[hour])
+
+
+@njit(parallel=True, cache=True)
+def _adjust_delivery_times(hours, base):
+    out = np.empty_like(base)
+    for i in prange(base.size):
+        out[i] = _adjust_delivery_time(hours[i], base[i])
+    return out
 
-    # Inflate service times during rush-hour congestion
-    if hour in [7, 8, 9, 16, 17, 18]:
-        base *= 1.4
 
-    # Enforce a minimum feasible delivery time
-    return max(10, base)
+@njit(nogil=True, cache=True)
+def _adjust_delivery_times_serial(hours, base):
+    out = np.empty_like(base)
+    for i in range(base.size):
+        out[i] = _adjust_delivery_time(hours[i], base[i])
+    return out
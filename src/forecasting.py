@@ -1,9 +1,22 @@
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
 import pandas as pd
-from sklearn.ensemble import GradientBoostingRegressor
+from joblib import Memory
+from numba import get_num_threads, njit, prange
+from sklearn.ensemble import HistGradientBoostingRegressor
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import mean_absolute_error
 
 
+# Nanoseconds per hour
+_HOUR_NS = 3_600_000_000_000
+
+# On-disk cache of trained models, keyed by the training data
+_memory = Memory(Path(__file__).resolve().parents[1] / ".cache", verbose=0)
+
+
 def prepare_hourly_demand(orders_df):
     """
     Aggregate order-level data into hourly demand by zone.
@@ -21,27 +34,81 @@ def prepare_hourly_demand(orders_df):
         Hourly demand with engineered time-based features
     """
 
-    # Aggregate order counts by hour and zone
-    hourly = (
-        orders_df
-        .groupby([pd.Grouper(key="timestamp", freq="h"), "zone_id"])
-        .size()
-        .reset_index(name="orders")
-    )
+    # Orders without a timestamp or zone belong to no cell and are
+    # dropped, as groupby does with missing keys
+    keys = orders_df[["timestamp", "zone_id"]]
+    if keys.isna().any(axis=None):
+        keys = keys.dropna()
+
+    if keys.empty:
+        return pd.DataFrame({
+            "timestamp": keys["timestamp"].array,
+            "zone_id": keys["zone_id"].array,
+            "orders": np.empty(0, dtype=np.int64),
+            "hour": np.empty(0, dtype=np.int8),
+            "dayofweek": np.empty(0, dtype=np.int8),
+            "is_weekend": np.empty(0, dtype=bool)
+        })
 
-    # Time-based features commonly used in demand forecasting
-    hourly["hour"] = hourly["timestamp"].dt.hour
-    hourly["dayofweek"] = hourly["timestamp"].dt.dayofweek
-    hourly["is_weekend"] = hourly["dayofweek"] >= 5
+    # Floor timestamps to the (local) hour and index them from the first
+    # hour; encode zones as sorted integer codes
+    bucket_ns, tz = _hour_buckets(keys["timestamp"])
+    first_bucket = bucket_ns.min()
+    bucket_offsets = bucket_ns - first_bucket
+    if (bucket_offsets % _HOUR_NS).any():
+        # UTC offset changed by a fraction of an hour within the data, so
+        # hour starts are not evenly spaced; index the distinct hours
+        hour_vals, hour_idx = np.unique(bucket_ns, return_inverse=True)
+    else:
+        hour_idx = bucket_offsets // _HOUR_NS
+        hour_vals = first_bucket + _HOUR_NS * np.arange(hour_idx.max() + 1)
+    zone_codes, zone_vals = pd.factorize(keys["zone_id"], sort=True)
+
+    # Aggregate order counts by hour and zone over a dense cell grid
+    n_zones = len(zone_vals)
+    n_blocks = max(1, min(get_num_threads(), len(hour_idx) // 65536))
+    counts = _count_orders(
+        hour_idx,
+        zone_codes,
+        len(hour_vals),
+        n_zones,
+        n_blocks
+    ).ravel()
+
+    # Keep only hour/zone cells with observed orders
+    cells = np.flatnonzero(counts)
+    cell_hours = cells // n_zones
+
+    # Hour start timestamps, restored to the input timezone
+    hour_starts = pd.DatetimeIndex(hour_vals.view("datetime64[ns]"))
+    if tz is not None:
+        hour_starts = hour_starts.tz_localize("UTC").tz_convert(tz)
+
+    # Time-based features commonly used in demand forecasting,
+    # computed once per distinct hour
+    hour, dayofweek, is_weekend = _time_features(_epoch_hours(hour_starts))
+
+    hourly = pd.DataFrame({
+        "timestamp": hour_starts[cell_hours],
+        "zone_id": np.asarray(zone_vals)[cells % n_zones],
+        "orders": counts[cells],
+        "hour": hour[cell_hours],
+        "dayofweek": dayofweek[cell_hours],
+        "is_weekend": is_weekend[cell_hours]
+    })
 
     return hourly
 
 
+@_memory.cache
 def train_demand_model(hourly_demand):
     """
     Train a machine learning model to forecast hourly delivery demand.
 
-    Uses gradient boosting to capture non-linear time and zone effects.
+    Uses histogram-based gradient boosting to capture non-linear time
+    and zone effects, treating hour, day of week and zone as categorical.
+    Results are cached on disk, so repeated calls with the same data
+    return the previously trained model.
 
     Parameters
     ----------
@@ -50,23 +117,33 @@ def train_demand_model(hourly_demand):
 
     Returns
     -------
-    model : GradientBoostingRegressor
+    model : HistGradientBoostingRegressor
         Trained demand forecasting model
     mae : float
         Mean Absolute Error on holdout data
     """
 
-    # Feature matrix and target variable
-    X = hourly_demand[["hour", "dayofweek", "is_weekend", "zone_id"]]
-    y = hourly_demand["orders"]
+    # Feature matrix and target variable as compact float32 arrays,
+    # matching the matrix built by forecast_demand
+    features = ["hour", "dayofweek", "is_weekend", "zone_id"]
+    X = hourly_demand[features].to_numpy(dtype=np.float32)
+    y = hourly_demand["orders"].to_numpy(dtype=np.float32)
 
     # Time-aware train/test split (no shuffling)
     X_train, X_test, y_train, y_test = train_test_split(
         X, y, shuffle=False
     )
 
-    # Train gradient boosting regression model
-    model = GradientBoostingRegressor()
+    # Train histogram gradient boosting model with shallow trees for a
+    # fixed number of iterations; hour, dayofweek and zone_id are
+    # categorical features
+    model = HistGradientBoostingRegressor(
+        max_iter=100,
+        learning_rate=0.1,
+        max_depth=3,
+        early_stopping=False,
+        categorical_features=[0, 1, 3]
+    )
     model.fit(X_train, y_train)
 
     # Evaluate forecast accuracy using MAE
@@ -100,6 +177,47 @@ def forecast_demand(model, zones, periods=168, start_timestamp=None):
     if start_timestamp is None:
         raise ValueError("start_timestamp must be provided")
 
+    # Feature grid is cached per start time, timezone, horizon and zone
+    # set; only the model prediction runs on every call
+    start_timestamp = pd.Timestamp(start_timestamp)
+    grid, X = _build_forecast_grid(
+        start_timestamp, str(start_timestamp.tz), periods, tuple(zones)
+    )
+
+    # Generate demand forecasts
+    future_df = pd.DataFrame(grid)
+    future_df["forecast_orders"] = model.predict(X)
+
+    return future_df
+
+
+@lru_cache(maxsize=32)
+def _build_forecast_grid(start_timestamp, tz, periods, zones):
+    """
+    Build the time × zone forecast grid and its feature matrix.
+
+    Returned arrays are read-only since they are shared between calls.
+
+    Parameters
+    ----------
+    start_timestamp : pd.Timestamp
+        Forecast start time
+    tz : str
+        Timezone of `start_timestamp`; part of the cache key since the
+        same instant in different timezones compares (and hashes) equal
+    periods : int
+        Number of future hours to forecast
+    zones : tuple
+        Zone identifiers
+
+    Returns
+    -------
+    grid : dict
+        Grid columns: timestamp, zone_id, hour, dayofweek, is_weekend
+    X : np.ndarray
+        float32 feature matrix with columns in training order
+    """
+
     # Generate future hourly timestamps
     future = pd.date_range(
         start=start_timestamp,
@@ -107,20 +225,150 @@ def forecast_demand(model, zones, periods=168, start_timestamp=None):
         freq="h"
     )
 
-    # Create full zone × time forecast grid
-    future_df = pd.DataFrame({
-        "timestamp": future.repeat(len(zones)),
-        "zone_id": list(zones) * len(future)
-    })
+    n_zones = len(zones)
 
-    # Feature engineering consistent with training data
-    future_df["hour"] = future_df["timestamp"].dt.hour
-    future_df["dayofweek"] = future_df["timestamp"].dt.dayofweek
-    future_df["is_weekend"] = future_df["dayofweek"] >= 5
+    # Full time × zone forecast grid
+    hour, dayofweek, is_weekend = _time_features(_epoch_hours(future))
+    grid = {
+        "timestamp": future.repeat(n_zones),
+        "zone_id": np.tile(np.asarray(zones), len(future)),
+        "hour": hour.repeat(n_zones),
+        "dayofweek": dayofweek.repeat(n_zones),
+        "is_weekend": is_weekend.repeat(n_zones)
+    }
 
-    # Generate demand forecasts
-    future_df["forecast_orders"] = model.predict(
-        future_df[["hour", "dayofweek", "is_weekend", "zone_id"]]
-    )
+    # Feature matrix with columns in training order
+    X = np.empty((len(grid["zone_id"]), 4), dtype=np.float32)
+    X[:, 0] = grid["hour"]
+    X[:, 1] = grid["dayofweek"]
+    X[:, 2] = grid["is_weekend"]
+    X[:, 3] = grid["zone_id"]
 
-    return future_df
+    X.flags.writeable = False
+    for column in ("zone_id", "hour", "dayofweek", "is_weekend"):
+        grid[column].flags.writeable = False
+
+    return grid, X
+
+
+def _hour_buckets(timestamps):
+    """
+    Floor timestamps to the start of their hour.
+
+    Timezone-aware timestamps are floored in local wall-clock time, so
+    repeated local hours at a DST change remain distinct hours.
+
+    Parameters
+    ----------
+    timestamps : array-like of datetime
+        Timestamps to floor
+
+    Returns
+    -------
+    bucket_ns : np.ndarray
+        int64 nanoseconds since the Unix epoch (UTC) of each hour start
+    tz : tzinfo or None
+        Timezone of the input timestamps
+    """
+
+    timestamps = pd.DatetimeIndex(timestamps).as_unit("ns")
+    instant_ns = timestamps.asi8
+    if timestamps.tz is None:
+        wall_ns = instant_ns
+    else:
+        wall_ns = timestamps.tz_localize(None).asi8
+
+    return instant_ns - wall_ns % _HOUR_NS, timestamps.tz
+
+
+def _epoch_hours(timestamps):
+    """
+    Convert timestamps to whole hours since the Unix epoch.
+
+    Timezone-aware timestamps are taken in local wall-clock time,
+    consistent with the `.dt` accessors.
+
+    Parameters
+    ----------
+    timestamps : array-like of datetime
+        Timestamps to convert
+
+    Returns
+    -------
+    np.ndarray
+        int64 hours since 1970-01-01 00:00
+    """
+
+    timestamps = pd.DatetimeIndex(timestamps)
+    if timestamps.tz is not None:
+        timestamps = timestamps.tz_localize(None)
+
+    return timestamps.to_numpy().astype("datetime64[h]").view("i8")
+
+
+def _time_features(epoch_hours):
+    """
+    Derive calendar features from hours since the Unix epoch.
+
+    Parameters
+    ----------
+    epoch_hours : np.ndarray
+        int64 hours since 1970-01-01 00:00
+
+    Returns
+    -------
+    hour : np.ndarray
+        Hour of day (0–23)
+    dayofweek : np.ndarray
+        Day of week, Monday=0 (1970-01-01 was a Thursday)
+    is_weekend : np.ndarray
+        Saturday or Sunday indicator
+    """
+
+    hour = (epoch_hours % 24).astype(np.int8)
+    dayofweek = ((epoch_hours // 24 + 3) % 7).astype(np.int8)
+    is_weekend = dayofweek >= 5
+
+    return hour, dayofweek, is_weekend
+
+
+@njit(parallel=True, cache=True)
+def _count_orders(hour_idx, zone_idx, n_hours, n_zones, n_blocks):
+    """
+    Count orders per hour/zone cell in a single parallel pass.
+
+    Orders are split into contiguous blocks, each counted in parallel
+    into its own buffer; the buffers are summed at the end.
+
+    Parameters
+    ----------
+    hour_idx : np.ndarray
+        Hour index of each order (0 to n_hours - 1)
+    zone_idx : np.ndarray
+        Zone code of each order (0 to n_zones - 1)
+    n_hours : int
+        Number of hours in the grid
+    n_zones : int
+        Number of zones in the grid
+    n_blocks : int
+        Number of blocks counted in parallel
+
+    Returns
+    -------
+    np.ndarray
+        Order counts of shape (n_hours, n_zones)
+    """
+
+    n_orders = hour_idx.size
+    block_size = (n_orders + n_blocks - 1) // n_blocks
+
+    partial = np.zeros((n_blocks, n_hours, n_zones), dtype=np.int64)
+    for b in prange(n_blocks):
+        for i in range(b * block_size, min((b + 1) * block_size, n_orders)):
+            partial[b, hour_idx[i], zone_idx[i]] += 1
+
+    counts = np.zeros((n_hours, n_zones), dtype=np.int64)
+    for b in range(n_blocks):
+        counts += partial[b]
+
+    return counts
@@ -1,3 +1,6 @@
+import numpy as np
+
+
 def compute_kpis(results_df, forecast_df):
     """
     Compute key operational KPIs from optimization results.
@@ -16,13 +19,13 @@ def compute_kpis(results_df, forecast_df):
     """
 
     # Total forecasted demand across zones and hours
-    total_forecast = forecast_df["forecast_orders"].sum()
+    total_forecast = _nansum(forecast_df["forecast_orders"])
 
     # Total late orders implied by optimization
-    total_late = results_df["late_orders"].sum()
+    total_late = _nansum(results_df["late_orders"])
 
     # Total driver-hours allocated
-    total_drivers = results_df["drivers"].sum()
+    total_drivers = _nansum(results_df["drivers"])
 
     kpis = {
         # Cost is set externally to allow flexible objective definitions
@@ -33,3 +36,8 @@ def compute_kpis(results_df, forecast_df):
     }
 
     return kpis
+
+
+def _nansum(column):
+    # Sum as a float NumPy array, skipping missing values as pandas does
+    return np.nansum(column.to_numpy(dtype=float, na_value=np.nan))
@@ -1,4 +1,5 @@
 from ortools.linear_solver import pywraplp
+import numpy as np
 import pandas as pd
 
 
@@ -7,13 +8,16 @@ def optimize_driver_allocation(
     cost_per_driver=30,
     late_penalty=50,
     capacity_per_driver=4,
-    hours_to_optimize=24
+    hours_to_optimize=24,
+    use_solver=False
 ):
     """
     Optimize driver allocation to minimize cost and late deliveries.
 
-    This function formulates and solves a linear optimization problem
+    This function formulates and solves an integer optimization problem
     where drivers are allocated by zone and hour to meet forecasted demand.
+    The problem is separable by zone and hour, so it is solved exactly in
+    closed form unless the OR-Tools solver is requested.
 
     Parameters
     ----------
@@ -27,6 +31,9 @@ def optimize_driver_allocation(
         Orders that a single driver can handle per hour
     hours_to_optimize : int
         Number of hours to include in optimization window
+    use_solver : bool
+        Solve with OR-Tools instead of the closed-form solution, e.g. as a
+        starting point for constraints that couple zones or hours
 
     Returns
     -------
@@ -36,55 +43,200 @@ def optimize_driver_allocation(
         Objective function value
     """
 
-    # Initialize OR-Tools solver
-    solver = pywraplp.Solver.CreateSolver("SCIP")
+    # Encode hours (as int64 epoch nanoseconds) and zones as integer codes
+    # in order of appearance; timestamps are only restored in the results
+    timestamps = pd.DatetimeIndex(forecast_df["timestamp"]).as_unit("ns")
+    valid = timestamps.notna()
+    hour_codes = np.full(len(timestamps), -1, dtype=np.intp)
+    hour_codes[valid], hours = pd.factorize(timestamps.asi8[valid])
+    zone_codes, zones = pd.factorize(forecast_df["zone_id"])
+
+    # Restrict optimization horizon for tractability; missing keys are
+    # coded -1 and excluded
+    hours = hours[:hours_to_optimize]
+    in_horizon = np.flatnonzero(
+        (hour_codes >= 0) & (hour_codes < len(hours)) & (zone_codes >= 0)
+    )
+
+    H, Z = len(hours), len(zones)
+
+    # Keep the first forecast for any duplicated hour/zone cell
+    cells = hour_codes[in_horizon] * Z + zone_codes[in_horizon]
+    cells, first = np.unique(cells, return_index=True)
+
+    # Dense hour × zone demand matrix, scattered directly from the codes
+    demand_mat = np.full(H * Z, np.nan)
+    demand_mat[cells] = (
+        forecast_df["forecast_orders"].to_numpy()[in_horizon[first]]
+    )
+    demand_mat = demand_mat.reshape(H, Z)
+
+    if np.isnan(demand_mat).any():
+        raise ValueError(
+            "forecast_df must provide a forecast for every hour/zone cell "
+            "in the optimization window"
+        )
+
+    if use_solver:
+        drivers, late_orders, total_cost = _solve_allocation(
+            demand_mat, cost_per_driver, late_penalty, capacity_per_driver
+        )
+    else:
+        drivers, late_orders = _closed_form_allocation(
+            demand_mat, cost_per_driver, late_penalty, capacity_per_driver
+        )
+        total_cost = float(
+            (cost_per_driver * drivers + late_penalty * late_orders).sum()
+        )
+
+    # Hour start timestamps, restored to the input timezone
+    hour_starts = pd.DatetimeIndex(hours.view("datetime64[ns]"))
+    if timestamps.tz is not None:
+        hour_starts = hour_starts.tz_localize("UTC").tz_convert(timestamps.tz)
+
+    # Extract solution into DataFrame, one column per hour × zone array
+    results_df = pd.DataFrame({
+        "timestamp": hour_starts.repeat(Z),
+        "zone_id": np.tile(zones.to_numpy(), H),
+        "drivers": drivers.ravel(),
+        "late_orders": late_orders.ravel()
+    })
+
+    return results_df, total_cost
+
+
+def _closed_form_allocation(
+    demand_mat,
+    cost_per_driver,
+    late_penalty,
+    capacity_per_driver
+):
+    """
+    Exact integer solution of the per-cell allocation problem.
+
+    Each hour/zone cell minimizes cost * drivers + penalty * late subject to
+    drivers * capacity + late >= demand, with both variables non-negative
+    integers.
+
+    Parameters
+    ----------
+    demand_mat : np.ndarray
+        Forecast demand by hour (rows) and zone (columns)
+    cost_per_driver : float
+        Cost per driver per hour
+    late_penalty : float
+        Penalty cost per late order
+    capacity_per_driver : int
+        Orders that a single driver can handle per hour
+
+    Returns
+    -------
+    drivers : np.ndarray
+        Drivers allocated per hour and zone
+    late_orders : np.ndarray
+        Late orders per hour and zone
+    """
+
+    demand = np.maximum(demand_mat, 0)
+
+    # A driver costs more than the late orders they would prevent
+    if late_penalty * capacity_per_driver < cost_per_driver:
+        return np.zeros_like(demand), np.ceil(demand)
+
+    # Fully utilized drivers are always worth staffing; the residual demand
+    # is either covered by one more driver or left as late orders
+    full = np.floor(demand / capacity_per_driver)
+    residual = np.ceil(demand - full * capacity_per_driver)
+    extra = cost_per_driver <= late_penalty * residual
+
+    drivers = full + extra
+    late_orders = np.where(extra, 0.0, residual)
 
-    # Restrict optimization horizon for tractability
-    hours = forecast_df["timestamp"].unique()[:hours_to_optimize]
-    zones = forecast_df["zone_id"].unique()
+    return drivers, late_orders
 
-    drivers = {}
-    late_orders = {}
 
-    # Decision variables: drivers and late orders per zone/hour
-    for h in hours:
-        for z in zones:
-            drivers[h, z] = solver.IntVar(0, solver.infinity(), f"d_{h}_{z}")
-            late_orders[h, z] = solver.IntVar(0, solver.infinity(), f"l_{h}_{z}")
+def _solve_allocation(
+    demand_mat,
+    cost_per_driver,
+    late_penalty,
+    capacity_per_driver
+):
+    """
+    Solve the allocation problem with OR-Tools.
+
+    The LP relaxation is solved with GLOP and driver counts are rounded up
+    to whole drivers, so the result is feasible but may cost slightly more
+    than the exact integer optimum.
+
+    Parameters
+    ----------
+    demand_mat : np.ndarray
+        Forecast demand by hour (rows) and zone (columns)
+    cost_per_driver : float
+        Cost per driver per hour
+    late_penalty : float
+        Penalty cost per late order
+    capacity_per_driver : int
+        Orders that a single driver can handle per hour
+
+    Returns
+    -------
+    drivers : np.ndarray
+        Drivers allocated per hour and zone
+    late_orders : np.ndarray
+        Late orders per hour and zone
+    total_cost : float
+        Objective function value
+    """
 
-    # Demand satisfaction constraints
-    for h in hours:
-        for z in zones:
-            demand = forecast_df[
-                (forecast_df["timestamp"] == h) &
-                (forecast_df["zone_id"] == z)
-            ]["forecast_orders"].values[0]
+    # Initialize OR-Tools LP solver
+    solver = pywraplp.Solver.CreateSolver("GLOP")
 
-            solver.Add(
-                drivers[h, z] * capacity_per_driver + late_orders[h, z] >= demand
-            )
+    H, Z = demand_mat.shape
 
-    # Objective: minimize labor cost and lateness penalties
+    infinity = solver.infinity()
     objective = solver.Objective()
-    for h, z in drivers:
-        objective.SetCoefficient(drivers[h, z], cost_per_driver)
-        objective.SetCoefficient(late_orders[h, z], late_penalty)
+
+    # Decision variables: drivers and late orders per hour/zone,
+    # stored by integer position rather than keyed by timestamp
+    drivers = np.empty((H, Z), dtype=object)
+    late_orders = np.empty((H, Z), dtype=object)
+
+    # Build variables, demand rows and objective terms in a single sweep,
+    # setting coefficients directly instead of via linear expressions
+    for hi in range(H):
+        for zi in range(Z):
+            d_var = solver.NumVar(0, infinity, f"d_{hi}_{zi}")
+            l_var = solver.NumVar(0, infinity, f"l_{hi}_{zi}")
+            drivers[hi, zi] = d_var
+            late_orders[hi, zi] = l_var
+
+            # Demand satisfaction: drivers * capacity + late >= demand
+            demand = solver.Constraint(float(demand_mat[hi, zi]), infinity)
+            demand.SetCoefficient(d_var, capacity_per_driver)
+            demand.SetCoefficient(l_var, 1)
+
+            # Objective: minimize labor cost and lateness penalties
+            objective.SetCoefficient(d_var, cost_per_driver)
+            objective.SetCoefficient(l_var, late_penalty)
 
     objective.SetMinimization()
 
     # Solve optimization problem
     solver.Solve()
 
-    # Extract solution into DataFrame
-    results = []
-    for h, z in drivers:
-        results.append({
-            "timestamp": h,
-            "zone_id": z,
-            "drivers": drivers[h, z].solution_value(),
-            "late_orders": late_orders[h, z].solution_value()
-        })
+    # Extract solution values by position
+    solution_value = np.vectorize(lambda var: var.solution_value(), otypes=[float])
+
+    # Round up to whole drivers (with a tolerance for LP round-off) and
+    # count any remaining demand as whole late orders
+    drivers = np.ceil(solution_value(drivers) - 1e-9)
+    late_orders = np.maximum(
+        np.ceil(demand_mat - drivers * capacity_per_driver - 1e-9), 0
+    )
 
-    results_df = pd.DataFrame(results)
+    total_cost = float(
+        (cost_per_driver * drivers + late_penalty * late_orders).sum()
+    )
 
-    return results_df, objective.Value()
+    return drivers, late_orders, total_cost